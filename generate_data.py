@@ -1,10 +1,8 @@
 import pandas as pd
 import numpy as np
-import random
 
 # 設定隨機種子以確保結果可重現
-np.random.seed(42)
-random.seed(42)
+rng = np.random.default_rng(42)
 
 # 1. 參數設定
 TARGET_ROWS = 10000
@@ -12,65 +10,75 @@ categories = ['Electronics', 'Home', 'Food', 'Shipping', 'Office', 'Apparel', 'I
 vendors = ['Tokyo Electronics', 'Fukuoka Logistics', 'Hokkaido Foods', 'Kyoto Crafts', 
            'Osaka Supplies', 'Nagoya Parts', 'Sapporo Steel']
 
-data = []
+# 2. 輔助函數：製造髒數據 (整欄向量化，只對需要的列做字串格式化)
+def make_dirty_cost(vals):
+    r = rng.random(len(vals))
+    out = vals.astype(object) # 正常數值
+    missing = r < 0.05 # 缺失值
+    dollar = (r >= 0.05) & (r < 0.10) # 帶幣別符號
+    usd = (r >= 0.10) & (r < 0.15) # 帶文字
+    comma = (vals > 1000) & (r >= 0.15) & (r < 0.20) # 帶逗號 (例如 1,200.00)
+    quote = (r >= 0.15) & (r < 0.22) & ~comma # 純文字垃圾
+    out[missing] = None
+    out[dollar] = [f"${v:.2f}" for v in vals[dollar]]
+    out[usd] = [f"USD {v:.2f}" for v in vals[usd]]
+    out[comma] = [f"{v:,.2f}" for v in vals[comma]]
+    out[quote] = "Quote Pending"
+    return out
 
-# 2. 輔助函數：製造髒數據
-def make_dirty_cost(val):
-    r = random.random()
-    if r < 0.05: return None # 缺失值
-    if r < 0.10: return f"${val:.2f}" # 帶幣別符號
-    if r < 0.15: return f"USD {val:.2f}" # 帶文字
-    if val > 1000 and r < 0.20: return f"{val:,.2f}" # 帶逗號 (例如 1,200.00)
-    if r < 0.22: return "Quote Pending" # 純文字垃圾
-    return val # 正常數值
+def make_dirty_stock(vals):
+    r = rng.random(len(vals))
+    out = vals.astype(object)
+    negative = r < 0.03 # 負庫存 (邏輯錯誤)
+    missing = (r >= 0.03) & (r < 0.06) # 缺失值
+    pcs = (r >= 0.06) & (r < 0.10) # 帶單位
+    out[negative] = -vals[negative]
+    out[missing] = None
+    out[pcs] = [f"{v} pcs" for v in vals[pcs]]
+    return out
 
-def make_dirty_stock(val):
-    r = random.random()
-    if r < 0.03: return -val # 負庫存 (邏輯錯誤)
-    if r < 0.06: return None # 缺失值
-    if r < 0.10: return f"{val} pcs" # 帶單位
-    return val
+# 3. 生成 10,000 筆數據 (以 NumPy 整欄批次產生)
+# 生成模擬 SKU
+sku_prefix = rng.choice(['A', 'B', 'C', 'X', 'Y', 'Z'], TARGET_ROWS)
+sku_number = rng.integers(1000, 10000, TARGET_ROWS).astype(str)
+sku = np.char.add('SKU-', np.char.add(sku_prefix, sku_number))
+cat = np.asarray(categories)[rng.integers(0, len(categories), TARGET_ROWS)]
+vendor = np.asarray(vendors)[rng.integers(0, len(vendors), TARGET_ROWS)]
 
-# 3. 生成 10,000 筆數據
-for i in range(TARGET_ROWS):
-    # 生成模擬 SKU
-    sku = f"SKU-{random.choice(['A','B','C','X','Y','Z'])}{random.randint(1000, 9999)}"
-    cat = random.choice(categories)
-    vendor = random.choice(vendors)
-    
-    # 基礎數值
-    cost = round(random.uniform(5, 500), 2)
-    demand = random.randint(1, 100) # 日均銷量
-    safety_stock = int(demand * random.uniform(7, 14)) # 安全庫存
-    stock = int(demand * random.uniform(0, 60)) # 當前庫存 (0~60天水位)
-    lead_time = random.randint(3, 30) # 交期
-    
-    # --- 注入髒數據邏輯 ---
-    
-    # 類別大小寫混亂 & 拼字錯誤
-    if random.random() < 0.1:
-        cat = cat.lower() if random.random() < 0.5 else cat.upper()
-    
-    # SKU 前後空白 (Trim 問題)
-    if random.random() < 0.05:
-        sku = f" {sku} "
-        
-    row = {
-        'Product_ID': sku,
-        'Category': cat,
-        'Unit_Cost_Raw': make_dirty_cost(cost),   # 髒成本欄位
-        'Current_Stock_Raw': make_dirty_stock(stock), # 髒庫存欄位
-        'Daily_Demand_Est': demand if random.random() > 0.05 else np.nan, # 5% 缺失銷量
-        'Safety_Stock_Target': safety_stock,
-        'Vendor_Name': vendor,
-        'Lead_Time_Days': lead_time
-    }
-    data.append(row)
+# 基礎數值
+cost = rng.uniform(5, 500, TARGET_ROWS).round(2)
+demand = rng.integers(1, 101, TARGET_ROWS) # 日均銷量
+safety_stock = (demand * rng.uniform(7, 14, TARGET_ROWS)).astype(int) # 安全庫存
+stock = (demand * rng.uniform(0, 60, TARGET_ROWS)).astype(int) # 當前庫存 (0~60天水位)
+lead_time = rng.integers(3, 31, TARGET_ROWS) # 交期
 
-df_dirty = pd.DataFrame(data)
+# --- 注入髒數據邏輯 ---
 
-# 加入重複值 (Duplicate Rows)
-df_dirty = pd.concat([df_dirty, df_dirty.sample(50)], ignore_index=True)
+# 類別大小寫混亂 & 拼字錯誤
+messy_case = rng.random(TARGET_ROWS) < 0.1
+to_lower = rng.random(TARGET_ROWS) < 0.5
+cat = np.where(messy_case & to_lower, np.char.lower(cat), cat)
+cat = np.where(messy_case & ~to_lower, np.char.upper(cat), cat)
+
+# SKU 前後空白 (Trim 問題)
+padded = rng.random(TARGET_ROWS) < 0.05
+sku = np.where(padded, np.char.add(np.char.add(' ', sku), ' '), sku)
+
+columns = {
+    'Product_ID': sku,
+    'Category': cat,
+    'Unit_Cost_Raw': make_dirty_cost(cost),   # 髒成本欄位
+    'Current_Stock_Raw': make_dirty_stock(stock), # 髒庫存欄位
+    'Daily_Demand_Est': np.where(rng.random(TARGET_ROWS) > 0.05, demand, np.nan), # 5% 缺失銷量
+    'Safety_Stock_Target': safety_stock,
+    'Vendor_Name': vendor,
+    'Lead_Time_Days': lead_time
+}
+
+# 加入重複值 (Duplicate Rows)：在建立 DataFrame 前直接對各欄位陣列取列索引
+dup_idx = rng.choice(TARGET_ROWS, 50, replace=False)
+row_idx = np.concatenate([np.arange(TARGET_ROWS), dup_idx])
+df_dirty = pd.DataFrame({name: col[row_idx] for name, col in columns.items()})
 
 # 匯出 CSV
 df_dirty.to_csv('Supply_Chain_Inventory_Dirty_10k.csv', index=False)